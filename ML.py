@@ -7,24 +7,24 @@ from sklearn.impute import SimpleImputer
 from sklearn.metrics import mean_squared_error, r2_score
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+import pickle
 
+import store
 
-def read_file(file_name):
-    dir_path = os.path.dirname(os.path.realpath(__file__))
-    file_path = os.path.join(dir_path, file_name)
+MODEL_FILE_NAME = "realquantml_models.pkl"
 
-    # Load the data page 1 and page 2
-    data_first_sheet = pd.read_excel(file_path, sheet_name=0)
+# columns that are not model features
+NON_FEATURE_COLUMNS = ['Sold Date', 'Address', 'Website', 'Property Type', 'Zip Code']
 
 
-    # Concatenate the two DataFrames if they have the same structure
-    data = pd.concat([data_first_sheet], ignore_index=True)
+def default_model_path():
+    return os.path.join(store.desktop_path(), MODEL_FILE_NAME)
 
+
+def train_models(data, output_path=None, show=False):
     # Drop unnecessary columns
-    data = data.drop(
-        ['Sold Date', 'Address', 'Website', 'Property Type'], axis=1)
+    data = data.drop(NON_FEATURE_COLUMNS, axis=1, errors='ignore')
 
     # Prepare the features and target variable
     X = data.drop('Sold Price', axis=1)
@@ -32,7 +32,7 @@ def read_file(file_name):
 
     if y.isna().any():
         print("NaNs found in target variable 'y'. Handling NaNs...")
-        y = y.fillna(y.mean()) 
+        y = y.fillna(y.mean())
 
     imputer = SimpleImputer(strategy='mean')
     X_imputed = imputer.fit_transform(X)
@@ -83,10 +83,20 @@ def read_file(file_name):
     for feature, coef in zip(feature_names, coefficients):
         print(f"{feature}: {coef}")
 
+    plot_feature_importances(X.columns, model_forest.feature_importances_,
+                             output_path=output_path, show=show)
+
+    return {'features': list(X.columns), 'imputer': imputer, 'scaler': scaler,
+            'linear': model, 'forest': model_forest}
+
+
+def plot_feature_importances(feature_names, importances, output_path=None, show=False):
+    # matplotlib is only needed here, so prediction never pays for it
+    import matplotlib.pyplot as plt
+
     # Feature Importances from Random Forest
-    importances = model_forest.feature_importances_
     indices = np.argsort(importances)[::-1]
-    feature_names = X.columns[indices]
+    feature_names = np.asarray(feature_names)[indices]
 
     # Plotting feature importances for Random Forest
     plt.figure(figsize=(10, 6))
@@ -96,12 +106,40 @@ def read_file(file_name):
     plt.xlim([-1, len(importances)])
     plt.ylabel("Importance")
     plt.xlabel("Feature")
-    plt.show()
+    if output_path:
+        plt.savefig(output_path, bbox_inches='tight')
+        print(f"Feature importances saved to {output_path}")
+    if show:
+        plt.show()
+    plt.close()
 
-if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python real_estate_analysis.py <file_name.xlsx>")
-        sys.exit(1)
 
-    file_name = sys.argv[1]
-    read_file(file_name)
+# function to save / load the fitted imputer, scaler and models together
+def save_models(models, model_path=None):
+    model_path = model_path or default_model_path()
+    os.makedirs(os.path.dirname(os.path.abspath(model_path)), exist_ok=True)
+    with open(model_path, 'wb') as f:
+        pickle.dump(models, f)
+    print(f"Models saved to {model_path}")
+
+
+def load_models(model_path=None):
+    with open(model_path or default_model_path(), 'rb') as f:
+        return pickle.load(f)
+
+
+# function to add predicted prices to a frame of listings
+def predict(data, models):
+    # the scaler was fitted on a named frame, so transform one too
+    X = pd.DataFrame(models['imputer'].transform(data[models['features']]),
+                     columns=models['features'], index=data.index)
+    X_scaled = models['scaler'].transform(X)
+    predictions = data.copy()
+    predictions['Predicted Price'] = models['forest'].predict(X_scaled).round()
+    predictions['Predicted Price (Linear)'] = models['linear'].predict(X_scaled).round()
+    return predictions
+
+
+if __name__ == "__main__":
+    import realquantml
+    realquantml.main(['train'] + sys.argv[1:])
@@ -0,0 +1,420 @@
+import argparse
+import gc
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib.metadata import version
+
+import numpy as np
+import pandas as pd
+
+import realquantml
+
+# The pipeline modules are not imported here: each stage runs in a worker
+# process that imports only the module it measures (STAGE_MODULES).
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+STAGES = ['normalize', 'analysis', 'ml', 'store']
+
+# largest size each stage runs at unless --ignore_caps is given; the
+# unbounded 100-tree forest is ~700 MB at 100k rows and grows with the data
+STAGE_MAX_ROWS = {'ml': 100_000}
+
+# module each stage exercises; imported by the worker before measuring
+STAGE_MODULES = {'normalize': 'main', 'analysis': 'analysis', 'ml': 'ML', 'store': 'store'}
+
+STREETS = np.array([
+    'Main St', 'Oak Ave', 'Maple Dr', 'Cedar Ln', 'Pine St', 'Elm St',
+    'Washington Blvd', 'Lake Rd', 'Hill St', 'Park Ave', 'Sunset Blvd',
+    'River Rd', 'Church St', 'Highland Ave', 'Forest Dr', 'Meadow Ln',
+])
+CITIES = np.array([
+    ('Springfield', 'IL'), ('Riverside', 'CA'), ('Franklin', 'TN'),
+    ('Greenville', 'SC'), ('Madison', 'WI'), ('Arlington', 'TX'),
+    ('Salem', 'OR'), ('Fairview', 'NJ'), ('Clinton', 'MS'), ('Georgetown', 'KY'),
+])
+PROPERTY_TYPES = ['Single Family', 'Townhomes', 'Apartments']
+REALTOR_COLUMNS = ['Sold Date', 'Address', 'Sold Price', 'Website', 'Time On Market']
+REPO_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+# function to generate a seeded 'Combined Properties' sheet with the NaNs,
+# duplicate addresses and price outliers real exports contain
+def generate_listings(n_rows, seed=42, n_zip_codes=50, nan_rate=0.03,
+                      duplicate_rate=0.02, outlier_rate=0.01):
+    rng = np.random.default_rng(seed)
+
+    # each zip code gets a city and its own price level
+    zip_codes = rng.choice(np.arange(10001, 99951), n_zip_codes, replace=False)
+    zip_cities = CITIES[rng.integers(0, len(CITIES), n_zip_codes)]
+    zip_factor = rng.uniform(0.6, 2.5, n_zip_codes)
+    zip_index = rng.integers(0, n_zip_codes, n_rows)
+
+    living_area = rng.lognormal(np.log(1800), 0.4, n_rows).round()
+    bedrooms = np.clip(np.round(living_area / 600 +
+                       rng.normal(0, 0.7, n_rows)), 1, 8)
+    bathrooms = np.clip(np.round((bedrooms * 0.6 +
+                        rng.normal(0, 0.5, n_rows)) * 2) / 2, 1, 6)
+
+    # sales over the last five years with ~4% annual appreciation
+    days_ago = rng.integers(0, 5 * 365, n_rows)
+    sold_date = pd.Timestamp('2024-12-31') - pd.to_timedelta(days_ago, unit='D')
+    appreciation = 1.04 ** (-days_ago / 365)
+    price = (180 * living_area * zip_factor[zip_index] * appreciation *
+             rng.lognormal(0, 0.15, n_rows)).round(-3)
+
+    outliers = rng.random(n_rows) < outlier_rate
+    price[outliers] *= rng.choice([0.1, 8.0], outliers.sum())
+
+    # unique street numbers, then copy some addresses to create duplicates
+    house_id = rng.permutation(n_rows) + 1
+    address = (pd.Series(house_id).astype(str) + ' ' +
+               STREETS[rng.integers(0, len(STREETS), n_rows)] + ', ' +
+               zip_cities[zip_index, 0] + ', ' + zip_cities[zip_index, 1] +
+               ' ' + zip_codes[zip_index].astype(str))
+    duplicates = np.flatnonzero(rng.random(n_rows) < duplicate_rate)
+    address.iloc[duplicates] = address.iloc[
+        rng.integers(0, n_rows, len(duplicates))].to_numpy()
+
+    data = pd.DataFrame({
+        'Sold Date': sold_date.strftime('%m/%d/%Y'),
+        'Address': address,
+        'Sold Price': price,
+        'Bedrooms': bedrooms,
+        'Bathrooms': bathrooms,
+        'Living Area': living_area,
+        'Property Type': rng.choice(PROPERTY_TYPES, n_rows, p=[0.6, 0.25, 0.15]),
+        'Time On Market': rng.gamma(2.0, 20.0, n_rows).astype(int),
+        'Website': 'https://www.zillow.com/homedetails/' +
+                   pd.Series(house_id).astype(str) + '_zpid/',
+    })
+
+    for column in ['Sold Price', 'Bedrooms', 'Bathrooms', 'Living Area']:
+        data.loc[rng.random(n_rows) < nan_rate, column] = np.nan
+
+    return data
+
+
+# each stage is (setup, run): setup builds the stage input outside the
+# measured region, run is the pipeline code being measured
+
+def setup_normalize(data):
+    # Zillow carries every column; Realtor a subset, overlapping by 10%
+    split = int(len(data) * 0.6)
+    overlap = int(len(data) * 0.1)
+    df_props = data.iloc[:split]
+    df_realtor = data.iloc[split - overlap:][REALTOR_COLUMNS]
+    return df_props, df_realtor
+
+
+def run_normalize(inputs):
+    import main
+    df_props, df_realtor = inputs
+    main.combine_listings(df_props, df_realtor, 'Sold', 'Single Family')
+
+
+def setup_analysis(data):
+    data = data.copy()
+    data['Sold Date'] = pd.to_datetime(data['Sold Date'], format='%m/%d/%Y')
+    return data
+
+
+def run_analysis(data):
+    import analysis
+    analysis.annual_mean_prices(analysis.prepare_data(data))
+
+
+def setup_ml(data):
+    import matplotlib
+    matplotlib.use('Agg')  # keep the feature-importance plot from blocking
+    import matplotlib.pyplot  # loaded here so its memory is not counted as the stage's
+    return data
+
+
+def run_ml(data):
+    import ML
+    import matplotlib.pyplot as plt
+    ML.train_models(data)
+    plt.close('all')
+
+
+def setup_store(data):
+    return data
+
+
+def run_store(data):
+    import store
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, store.DB_FILE_NAME)
+        store.upsert_listings(data, '10001', 'Sold', 'Single Family', db_path=db_path)
+        store.load_listings(zip_codes=['10001'], status_type='Sold',
+                            start_date='2023-01-01', db_path=db_path)
+
+
+STAGE_FUNCTIONS = {
+    'normalize': (setup_normalize, run_normalize),
+    'analysis': (setup_analysis, run_analysis),
+    'ml': (setup_ml, run_ml),
+    'store': (setup_store, run_store),
+}
+
+
+# VmRSS is the current resident memory, VmHWM its peak (Linux only)
+def proc_status_mb(field):
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+# writing 5 to clear_refs resets VmHWM, so the next peak is the stage's own
+def reset_peak_rss():
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+# all-time peak RSS; ru_maxrss is KB on Linux, bytes on macOS
+def max_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+# function run in the worker process: load the pre-generated input, import
+# the stage's module, then time the stage. stage_mb is the peak RSS during
+# the stage minus the RSS just before it, so interpreter, imports and input
+# are not counted
+def measure_stage(stage, input_path, repeat=3):
+    setup, run = STAGE_FUNCTIONS[stage]
+    importlib.import_module(STAGE_MODULES[stage])
+    inputs = setup(pd.read_pickle(input_path))
+    gc.collect()
+
+    input_mb = proc_status_mb('VmRSS')
+    if reset_peak_rss() and input_mb is not None:
+        peak_before = input_mb
+        read_peak = lambda: proc_status_mb('VmHWM')
+    else:
+        # without clear_refs only growth beyond the earlier peak is visible,
+        # so stage_mb is a lower bound here
+        peak_before = max_rss_mb()
+        read_peak = max_rss_mb
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run(inputs)
+        timings.append(time.perf_counter() - start)
+
+    peak = read_peak()
+    stage_mb = max(peak - peak_before, 0.0) if peak is not None else None
+    return {'stage': stage, 'seconds': min(timings), 'stage_mb': stage_mb,
+            'input_mb': input_mb}
+
+
+# each stage/size runs in a fresh process so its memory is its own
+def run_worker(stage, n_rows, input_path, repeat):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, 'result.json')
+        process = subprocess.run(
+            [sys.executable, os.path.realpath(__file__), '--worker', stage,
+             '--worker_input', input_path, '--repeat', str(repeat),
+             '--worker_output', output_path],
+            cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if process.returncode != 0:
+            error = process.stderr.decode().strip().splitlines()
+            return {'stage': stage, 'rows': n_rows, 'seconds': None, 'stage_mb': None,
+                    'failed': error[-1] if error else f"exit code {process.returncode}"}
+        with open(output_path) as f:
+            return dict(json.load(f), rows=n_rows)
+
+
+def run_benchmarks(sizes, stages, seed=42, repeat=3, ignore_caps=False):
+    results = []
+    skipped = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_rows in sizes:
+            print(f"{n_rows:,} synthetic listings:")
+            # generated once per size and shared by every stage's worker
+            input_path = os.path.join(tmp_dir, f"listings_{n_rows}.pkl")
+            generate_listings(n_rows, seed=seed).to_pickle(input_path)
+            for stage in stages:
+                cap = STAGE_MAX_ROWS.get(stage)
+                if cap is not None and n_rows > cap and not ignore_caps:
+                    skipped.append(f"{stage} at {n_rows:,} rows")
+                    results.append({'stage': stage, 'rows': n_rows, 'seconds': None,
+                                    'stage_mb': None, 'skipped': f"above {cap:,}-row cap"})
+                    print(f"  {stage:<10} skipped (above {cap:,}-row cap, see --ignore_caps)")
+                    continue
+
+                result = run_worker(stage, n_rows, input_path, repeat)
+                results.append(result)
+                if 'failed' in result:
+                    print(f"  {stage:<10} failed: {result['failed']}")
+                    continue
+                memory = (f", stage {result['stage_mb']:,.1f} MB (RSS before {result['input_mb']:,.1f} MB)"
+                          if result['stage_mb'] is not None and result['input_mb'] is not None else "")
+                print(f"  {stage:<10} {result['seconds']:10.3f} s{memory}")
+            os.remove(input_path)
+    if skipped:
+        print(f"Skipped: {', '.join(skipped)}")
+    return results
+
+
+# each startup run is a fresh interpreter, so nothing is cached from this one
+def time_command(command_args, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + command_args, cwd=REPO_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+# function to time CLI startup per subcommand: 'startup' is parsing the
+# command line (what lazy imports keep fast), 'import' adds the modules
+# the subcommand loads before doing any work
+def run_startup_benchmarks(repeat=5):
+    results = []
+    print("Timing CLI startup ...")
+    for command in realquantml.COMMAND_MODULES:
+        runs = {
+            f'startup:{command}': ['realquantml.py'] + command.split() + ['--help'],
+            f'import:{command}': ['-c', 'import realquantml; '
+                                  f'realquantml.import_command_modules({command!r})'],
+        }
+        for stage, command_args in runs.items():
+            try:
+                seconds = time_command(command_args, repeat)
+            except subprocess.CalledProcessError as e:
+                print(f"  {stage:<18} failed: {e.stderr.decode().strip().splitlines()[-1]}")
+                continue
+            results.append({'stage': stage, 'rows': 0,
+                            'seconds': seconds, 'stage_mb': None})
+            print(f"  {stage:<18} {seconds:10.3f} s")
+    return results
+
+
+def environment_info(seed, repeat):
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'sklearn': version('scikit-learn'),
+        'seed': seed,
+        'repeat': repeat,
+    }
+
+
+# function to compare against a saved baseline; returns the regressions.
+# A metric regresses only when it grows by more than the tolerance AND by
+# more than the absolute minimum, so millisecond stages can't fail on noise
+def compare_to_baseline(results, baseline, tolerance, min_slowdown=0.05, min_growth_mb=10):
+    min_increase = {'seconds': min_slowdown, 'stage_mb': min_growth_mb}
+    previous = {(entry['stage'], entry['rows']): entry
+                for entry in baseline['results']}
+    regressions = []
+    for entry in results:
+        old = previous.get((entry['stage'], entry['rows']))
+        if old is None:
+            continue
+        for metric in ['seconds', 'stage_mb']:
+            if entry.get(metric) is None or not old.get(metric):
+                continue
+            ratio = entry[metric] / old[metric]
+            regressed = (ratio > 1 + tolerance and
+                         entry[metric] - old[metric] > min_increase[metric])
+            status = "REGRESSION" if regressed else "ok"
+            print(f"  {entry['stage']:<18} {entry['rows']:>12,} {metric:<8} "
+                  f"{old[metric]:12.3f} -> {entry[metric]:12.3f} ({ratio:5.2f}x) {status}")
+            if status != "ok":
+                regressions.append(dict(entry, metric=metric, ratio=ratio))
+    return regressions
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the pipeline stages on synthetic listings")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Row counts to generate (default: 10k 100k 1M 10M)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES,
+                        help="Stages to run")
+    parser.add_argument("--seed", type=int, default=42,
+                        help="Seed for the synthetic data generator")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timed runs per stage; the fastest is kept")
+    parser.add_argument("--startup", action="store_true",
+                        help="Also time CLI startup and imports for each subcommand")
+    parser.add_argument("--startup_only", action="store_true",
+                        help="Only run the CLI startup benchmark")
+    parser.add_argument("--ignore_caps", action="store_true",
+                        help="Run every stage at every size, ignoring STAGE_MAX_ROWS")
+    parser.add_argument("--output", type=str, default="benchmark_results.json",
+                        help="Where to save the results (JSON)")
+    parser.add_argument("--baseline", type=str,
+                        help="Saved results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown/memory growth before flagging (0.25 = 25%%)")
+    parser.add_argument("--min_slowdown", type=float, default=0.05,
+                        help="Smallest slowdown in seconds that can be flagged")
+    parser.add_argument("--min_growth_mb", type=float, default=10,
+                        help="Smallest stage memory growth in MB that can be flagged")
+    # internal: run a single stage in this process (see run_worker)
+    parser.add_argument("--worker", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--worker_input", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--worker_output", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = measure_stage(args.worker, args.worker_input, repeat=args.repeat)
+        with open(args.worker_output, 'w') as f:
+            json.dump(result, f)
+        return
+
+    results = []
+    if not args.startup_only:
+        results += run_benchmarks(args.sizes, args.stages, seed=args.seed,
+                                  repeat=args.repeat, ignore_caps=args.ignore_caps)
+    if args.startup or args.startup_only:
+        results += run_startup_benchmarks(repeat=max(args.repeat, 5))
+
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment_info(args.seed, args.repeat),
+                   'results': results}, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Comparing with {args.baseline} (tolerance {args.tolerance:.0%}, "
+              f"at least {args.min_slowdown} s / {args.min_growth_mb} MB):")
+        regressions = compare_to_baseline(results, baseline, args.tolerance,
+                                          min_slowdown=args.min_slowdown,
+                                          min_growth_mb=args.min_growth_mb)
+        if regressions:
+            print(f"{len(regressions)} regression(s) found.")
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main_cli()
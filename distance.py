@@ -1,47 +1,63 @@
 import googlemaps
+import os
+import sys
 
-# Initialize with your Google API key
-gmaps = googlemaps.Client(key='YOURGOOGLEAPIKEY')
-
-# Geocode the address
-geocode_result = gmaps.geocode(input("Please copy the address directly from XLSX file : "))
-origin = geocode_result[0]['geometry']['location']
+# Initialize with your Google API key (or set GOOGLE_MAPS_API_KEY)
+API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY', 'YOURGOOGLEAPIKEY')
 
 # Find nearby schools or any facility
-school_types = ['school', 'university', 'college']
+SCHOOL_TYPES = ['school', 'university', 'college']
+DESIRED_TYPES = ["Elementary", "Middle", "High"]
+
+
+def nearby_schools(address, api_key=None, radius=5000):
+    gmaps = googlemaps.Client(key=api_key or API_KEY)
+
+    # Geocode the address
+    geocode_result = gmaps.geocode(address)
+    origin = geocode_result[0]['geometry']['location']
+
+    # Initialize an empty list to hold all places
+    all_places = []
+
+    # Perform a search for each type and append the results
+    for school_type in SCHOOL_TYPES:
+        places_result = gmaps.places_nearby(location=origin, radius=radius, type=school_type)
+        all_places.extend(places_result['results'])
+
+    # Filter the places based on desired types
+    filtered_places = [place for place in all_places
+                       if any(desired_type in place['name'] for desired_type in DESIRED_TYPES)]
 
-# Initialize an empty list to hold all places
-all_places = []
+    place_distances = []
 
-# Perform a search for each type and append the results
-for school_type in school_types:
-    places_result = gmaps.places_nearby(location=origin, radius=5000, type=school_type)
-    all_places.extend(places_result['results'])
+    # Calculate the distance from the address to each filtered school
+    for place in filtered_places:
+        school_location = place['geometry']['location']
+        place_name = place['name']
+        distance_matrix_result = gmaps.distance_matrix(origins=[origin],
+                                                       destinations=[school_location],
+                                                       mode='driving')
 
-desired_types = ["Elementary", "Middle", "High"]
+        # Convert distance from meters to miles
+        distance_meters = distance_matrix_result['rows'][0]['elements'][0]['distance']['value']
+        distance_miles = distance_meters / 1609.34
+        place_distances.append((place_name, distance_miles))
 
-# Filter the places based on desired types
-filtered_places = [place for place in all_places
-                   if any(desired_type in place['name'] for desired_type in desired_types)]
+    # Sort the places by distance
+    place_distances.sort(key=lambda x: x[1])
+    return place_distances
 
-place_distances = []
 
-# Calculate the distance from the address to each filtered school
-for place in filtered_places:
-    school_location = place['geometry']['location']
-    place_name = place['name']
-    distance_matrix_result = gmaps.distance_matrix(origins=[origin],
-                                                   destinations=[school_location],
-                                                   mode='driving')
+def print_nearby_schools(address=None, api_key=None, radius=5000):
+    if address is None:
+        address = input("Please copy the address directly from XLSX file : ")
 
-     # Convert distance from meters to miles
-    distance_meters = distance_matrix_result['rows'][0]['elements'][0]['distance']['value']
-    distance_miles = distance_meters / 1609.34 
-    place_distances.append((place_name, distance_miles))
+    # Print the sorted distances
+    for place_name, distance in nearby_schools(address, api_key=api_key, radius=radius):
+        print(f"{place_name}: {distance:.1f} miles")
 
-# Sort the places by distance
-place_distances.sort(key=lambda x: x[1])
 
-# Print the sorted distances
-for place_name, distance in place_distances:
-    print(f"{place_name}: {distance:.1f} miles")
\ No newline at end of file
+if __name__ == "__main__":
+    import realquantml
+    realquantml.main(['distance'] + sys.argv[1:])
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import pickle
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import StandardScaler
+
+import ML
+import store
+
+FLEET_DIR_NAME = "realquantml_fleet"
+REGISTRY_FILE_NAME = "registry.json"
+GLOBAL_SEGMENT = "global"
+
+# segments with fewer sold listings than this are priced by the global model
+MIN_SEGMENT_ROWS = 30
+# trees a forest starts with, gains on each refresh, and may grow to before
+# it is refit from scratch
+INITIAL_TREES = 100
+TREES_PER_REFRESH = 20
+MAX_TREES = 300
+
+
+def default_fleet_dir():
+    return os.path.join(store.desktop_path(), FLEET_DIR_NAME)
+
+
+def segment_id(zip_code, property_type):
+    return re.sub(r"[^A-Za-z0-9]+", "-", f"{zip_code}_{property_type}").strip("-")
+
+
+# store slices carry 'Zip Code'; workbooks only have it at the end of the address
+def segment_zip_codes(data):
+    if 'Zip Code' in data.columns:
+        return data['Zip Code'].astype(str).where(data['Zip Code'].notna())
+    return data['Address'].str.extract(r"(\d{5})(?:-\d{4})?\s*$", expand=False)
+
+
+# order-independent hash of the rows a segment model is trained on
+def data_fingerprint(data):
+    row_hashes = np.sort(pd.util.hash_pandas_object(data, index=False).to_numpy())
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def training_frame(data):
+    return data.drop(ML.NON_FEATURE_COLUMNS, axis=1, errors='ignore')
+
+
+# function run in the worker processes: fit one segment, warm-starting the
+# previous forest when there is one
+def fit_segment(data, previous=None, trees_per_refresh=TREES_PER_REFRESH, max_trees=MAX_TREES):
+    X = data.drop('Sold Price', axis=1)
+    y = data['Sold Price']
+    y = y.fillna(y.mean())
+
+    warm_start = (previous is not None and previous['features'] == list(X.columns) and
+                  previous['forest'].n_estimators + trees_per_refresh <= max_trees)
+
+    if warm_start:
+        # keep the imputer/scaler the existing trees were grown on
+        imputer = previous['imputer']
+        scaler = previous['scaler']
+        model_forest = previous['forest']
+        model_forest.set_params(n_estimators=model_forest.n_estimators + trees_per_refresh)
+    else:
+        imputer = SimpleImputer(strategy='mean').fit(X)
+        scaler = None
+        model_forest = RandomForestRegressor(n_estimators=INITIAL_TREES, warm_start=True,
+                                             random_state=42, n_jobs=1)
+
+    # fit/transform the scaler on a named frame, matching ML.train_models/predict
+    X_imputed = pd.DataFrame(imputer.transform(X), columns=X.columns, index=X.index)
+    if scaler is None:
+        scaler = StandardScaler().fit(X_imputed)
+    X_scaled = scaler.transform(X_imputed)
+    model = LinearRegression().fit(X_scaled, y)
+    model_forest.fit(X_scaled, y)
+
+    models = {'features': list(X.columns), 'imputer': imputer, 'scaler': scaler,
+              'linear': model, 'forest': model_forest}
+    return models, warm_start
+
+
+def load_registry(fleet_dir=None):
+    registry_path = os.path.join(fleet_dir or default_fleet_dir(), REGISTRY_FILE_NAME)
+    if not os.path.exists(registry_path):
+        return {'segments': {}}
+    with open(registry_path) as f:
+        return json.load(f)
+
+
+def save_registry(registry, fleet_dir=None):
+    registry_path = os.path.join(fleet_dir or default_fleet_dir(), REGISTRY_FILE_NAME)
+    # write then rename so a crash never leaves a half-written registry
+    with open(registry_path + '.tmp', 'w') as f:
+        json.dump(registry, f, indent=2, sort_keys=True)
+    os.replace(registry_path + '.tmp', registry_path)
+
+
+def load_segment_models(entry, fleet_dir=None):
+    with open(os.path.join(fleet_dir or default_fleet_dir(), entry['model_file']), 'rb') as f:
+        return pickle.load(f)
+
+
+# function to partition pooled sold listings by zip x property type and
+# (re)train only the segments whose data changed, in a process pool
+def train_fleet(data, fleet_dir=None, min_rows=None,
+                trees_per_refresh=TREES_PER_REFRESH, max_trees=MAX_TREES, max_workers=None):
+    fleet_dir = fleet_dir or default_fleet_dir()
+    min_rows = MIN_SEGMENT_ROWS if min_rows is None else min_rows
+    os.makedirs(fleet_dir, exist_ok=True)
+    registry = load_registry(fleet_dir)
+
+    data = data.assign(**{'Zip Code': segment_zip_codes(data)})
+    segments = {GLOBAL_SEGMENT: (None, None, training_frame(data))}
+    sparse = 0
+    # rows without a zip code or property type only train the global model
+    unsegmented = int(data[['Zip Code', 'Property Type']].isna().any(axis=1).sum())
+    for (zip_code, property_type), segment in data.groupby(['Zip Code', 'Property Type']):
+        if len(segment) < min_rows:
+            sparse += 1
+            continue
+        segments[segment_id(zip_code, property_type)] = (
+            zip_code, property_type, training_frame(segment))
+
+    # only segments whose data fingerprint changed are retrained
+    jobs = {}
+    for sid, (zip_code, property_type, segment) in segments.items():
+        fingerprint = data_fingerprint(segment)
+        entry = registry['segments'].get(sid)
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            continue
+        previous = load_segment_models(entry, fleet_dir) if entry is not None else None
+        jobs[sid] = (zip_code, property_type, segment, previous, fingerprint)
+
+    warm_started = 0
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fit_segment, segment, previous, trees_per_refresh, max_trees): sid
+                   for sid, (_, _, segment, previous, _) in jobs.items()}
+        for future in as_completed(futures):
+            sid = futures[future]
+            zip_code, property_type, segment, _, fingerprint = jobs[sid]
+            models, warm_start = future.result()
+            warm_started += warm_start
+
+            model_file = f"{sid}.pkl"
+            with open(os.path.join(fleet_dir, model_file), 'wb') as f:
+                pickle.dump(models, f)
+            registry['segments'][sid] = {
+                'zip_code': zip_code,
+                'property_type': property_type,
+                'fingerprint': fingerprint,
+                'rows': len(segment),
+                'n_estimators': models['forest'].n_estimators,
+                'model_file': model_file,
+                'trained_at': datetime.now().isoformat(timespec='seconds'),
+            }
+
+    # segments that went sparse or are no longer in the data fall back to
+    # the global model instead of keeping a stale one
+    stale = [sid for sid in registry['segments'] if sid not in segments]
+    for sid in stale:
+        model_path = os.path.join(fleet_dir, registry['segments'].pop(sid)['model_file'])
+        if os.path.exists(model_path):
+            os.remove(model_path)
+
+    save_registry(registry, fleet_dir)
+    print(f"Fleet: {len(jobs)} segment(s) trained ({warm_started} warm-started), "
+          f"{len(segments) - len(jobs)} unchanged, {len(stale)} removed, "
+          f"{sparse} sparse segment(s) use the global model")
+    if unsegmented:
+        print(f"{unsegmented} listing(s) without a zip code or property type only train the global model")
+    return registry
+
+
+# function to price listings with their segment model, falling back to the
+# global model where no segment model exists
+def predict_fleet(data, fleet_dir=None):
+    fleet_dir = fleet_dir or default_fleet_dir()
+    registry = load_registry(fleet_dir)
+    if GLOBAL_SEGMENT not in registry['segments']:
+        print(f"No trained fleet found in {fleet_dir}, train one first.")
+        return
+
+    data = data.reset_index(drop=True)
+    routes = pd.Series(
+        [segment_id(zip_code, property_type)
+         for zip_code, property_type in zip(segment_zip_codes(data), data['Property Type'])],
+        index=data.index)
+    routes[~routes.isin(registry['segments'].keys())] = GLOBAL_SEGMENT
+
+    predictions = []
+    for sid, rows in data.groupby(routes):
+        models = load_segment_models(registry['segments'][sid], fleet_dir)
+        predictions.append(ML.predict(rows, models).assign(**{'Model Segment': sid}))
+    return pd.concat(predictions).sort_index()
@@ -1,11 +1,12 @@
 import requests
 import pandas as pd
 import os
-import platform
-import argparse
+import sys
 import time
 from datetime import datetime
 
+import store
+
 # funciton to fetch Zillow data
 
 
@@ -102,10 +103,83 @@ def fetch_properties_realtor(zip_code=None, home_type=None, page=1, status_type=
     realtor_data = response.json()
     return realtor_data
 
+# function to merge both sources into the 'Combined Properties' layout
+
+
+def combine_listings(df_props, df_realtor, status_type=None, home_type=None):
+    df_combined_old = pd.concat([df_props, df_realtor]).reset_index(drop=True)
+    # print(f"df_combined_old DataFrame shape: {df_combined_old.shape}")
+
+    # drop duplicate
+    df_combined_old.drop_duplicates(
+        subset='Address', keep='first', inplace=True)
+    if status_type not in ["ForSale", "ForRent"]:
+        new_combined_order = ['Sold Date', 'Address', 'Sold Price',
+                              'Bedrooms', 'Bathrooms', 'Living Area',
+                              'Property Type', 'Time On Market', 'Website']
+    else:
+        new_combined_order = ['Address', 'Listed Price',
+                              'Bedrooms', 'Bathrooms', 'Living Area',
+                              'Property Type', 'Time On Market', 'Website']
+    df_combined = df_combined_old[new_combined_order].copy()
+
+    # format date
+    if status_type not in ["ForSale", "ForRent"]:
+        df_combined['Sold Date'] = pd.to_datetime(df_combined['Sold Date'])
+        df_combined = df_combined.sort_values(by='Sold Date', ascending=False)
+        df_combined['Sold Date'] = df_combined['Sold Date'].dt.strftime(
+            '%m/%d/%Y')
+
+    if status_type not in ["ForSale", "ForRent"]:
+        # Format numeric values and handle NaN
+        df_combined['Sold Price'] = pd.to_numeric(
+            df_combined['Sold Price'], errors='coerce')
+        df_combined['Sold Price'] = df_combined['Sold Price'].ffill()
+        df_combined['Bedrooms'] = pd.to_numeric(
+            df_combined['Bedrooms'], errors='coerce')
+        df_combined['Bathrooms'] = pd.to_numeric(
+            df_combined['Bathrooms'], errors='coerce')
+        df_combined['Living Area'] = pd.to_numeric(
+            df_combined['Living Area'], errors='coerce')
+    else:
+        df_combined['Listed Price'] = pd.to_numeric(
+            df_combined['Listed Price'], errors='coerce')
+        df_combined['Listed Price'] = df_combined['Listed Price'].ffill()
+        df_combined['Bedrooms'] = pd.to_numeric(
+            df_combined['Bedrooms'], errors='coerce')
+        df_combined['Bathrooms'] = pd.to_numeric(
+            df_combined['Bathrooms'], errors='coerce')
+        df_combined['Living Area'] = pd.to_numeric(
+            df_combined['Living Area'], errors='coerce')
+
+    # Fill NaN values for numeric columns
+    for column in ['Bedrooms', 'Bathrooms', 'Living Area']:
+        df_combined[column] = df_combined[column].fillna(
+            df_combined[column].median())
+
+    # handle NaN value for 'Property Type'
+    df_combined['Property Type'] = home_type
+
+    # if status is ForSale or ForRent, filter out '0' Listed Price
+    if status_type in ["ForSale", "ForRent"]:
+        df_combined = df_combined[df_combined['Listed Price'] != 0]
+
+    # int days on market and absolute value
+    df_combined['Time On Market'] = df_combined['Time On Market'].astype(int)
+    df_combined['Time On Market'] = df_combined['Time On Market'].abs()
+
+    # sort date from newest to oldest
+    if status_type in ["ForSale" or "ForRent"]:
+        df_combined.sort_values(by='Time On Market',
+                                ascending=False, inplace=True)
+
+    return df_combined
+
 # funciton to export data
 
 
-def fetch_and_export_data(zip_code=None, max_price=None, home_type=None, status_type=None, num_pages=None):
+def fetch_and_export_data(zip_code=None, max_price=None, home_type=None, status_type=None, num_pages=None,
+                          export_excel=False, db_path=None):
     # Check if max_price is provided and is a positive integer
     if max_price is None or max_price <= 0:
         print("Please enter a positive value for max price.")
@@ -158,7 +232,7 @@ def fetch_and_export_data(zip_code=None, max_price=None, home_type=None, status_
     df_props.dropna(subset=['price'], inplace=True)
     for column in ['bedrooms', 'bathrooms']:
         if column in df_props.columns:
-            df_props[column].ffill(inplace=True)
+            df_props[column] = df_props[column].ffill()
 
     # reformat url for better visualization
     if 'detailUrl' in df_props.columns:
@@ -313,106 +387,31 @@ def fetch_and_export_data(zip_code=None, max_price=None, home_type=None, status_
     print("School data fetched!")
     time.sleep(5)
 
-    # os file path
-    os_type = platform.system()
-    desktop_path = os.path.join(os.path.join(os.environ['USERPROFILE']), 'Desktop') if os_type == 'Windows' else os.path.join(
-        os.path.join(os.path.expanduser('~')), 'Desktop')
-    file_path = os.path.join(
-        desktop_path, f"{zip_code}_{status_type}_{home_type}.xlsx")
-
-    # XlsxWriter as the engine
-    writer = pd.ExcelWriter(file_path, engine='xlsxwriter')
-    df_combined_old = pd.concat([df_props, df_realtor]).reset_index(drop=True)
-    # print(f"df_combined_old DataFrame shape: {df_combined_old.shape}")
-
-    # drop duplicate
-    df_combined_old.drop_duplicates(
-        subset='Address', keep='first', inplace=True)
-    if status_type not in ["ForSale", "ForRent"]:
-        new_combined_order = ['Sold Date', 'Address', 'Sold Price',
-                              'Bedrooms', 'Bathrooms', 'Living Area',
-                              'Property Type', 'Time On Market', 'Website']
-    else:
-        new_combined_order = ['Address', 'Listed Price',
-                              'Bedrooms', 'Bathrooms', 'Living Area',
-                              'Property Type', 'Time On Market', 'Website']
-    df_combined = df_combined_old[new_combined_order].copy()
+    df_combined = combine_listings(df_props, df_realtor, status_type, home_type)
 
-    # format date
-    if status_type not in ["ForSale", "ForRent"]:
-        df_combined['Sold Date'] = pd.to_datetime(df_combined['Sold Date'])
-        df_combined = df_combined.sort_values(by='Sold Date', ascending=False)
-        df_combined['Sold Date'] = df_combined['Sold Date'].dt.strftime(
-            '%m/%d/%Y')
+    # upsert into the local store, keyed by canonical address + status
+    stored = store.upsert_listings(
+        df_combined, zip_code, status_type, home_type, db_path=db_path)
+    print(f"{stored} listings saved to {db_path or store.default_db_path()}")
 
-    if status_type not in ["ForSale", "ForRent"]:
-        # Format numeric values and handle NaN
-        df_combined['Sold Price'] = pd.to_numeric(
-            df_combined['Sold Price'], errors='coerce')
-        df_combined['Sold Price'].ffill(inplace=True)
-        df_combined['Bedrooms'] = pd.to_numeric(
-            df_combined['Bedrooms'], errors='coerce')
-        df_combined['Bathrooms'] = pd.to_numeric(
-            df_combined['Bathrooms'], errors='coerce')
-        df_combined['Living Area'] = pd.to_numeric(
-            df_combined['Living Area'], errors='coerce')
-    else:
-        df_combined['Listed Price'] = pd.to_numeric(
-            df_combined['Listed Price'], errors='coerce')
-        df_combined['Listed Price'].ffill(inplace=True)
-        df_combined['Bedrooms'] = pd.to_numeric(
-            df_combined['Bedrooms'], errors='coerce')
-        df_combined['Bathrooms'] = pd.to_numeric(
-            df_combined['Bathrooms'], errors='coerce')
-        df_combined['Living Area'] = pd.to_numeric(
-            df_combined['Living Area'], errors='coerce')
-
-    # Fill NaN values for numeric columns
-    for column in ['Bedrooms', 'Bathrooms', 'Living Area']:
-        df_combined[column].fillna(df_combined[column].median(), inplace=True)
-
-    # handle NaN value for 'Property Type'
-    df_combined['Property Type'] = home_type
-
-    # if status is ForSale or ForRent, filter out '0' Listed Price
-    if status_type in ["ForSale", "ForRent"]:
-        df_combined = df_combined[df_combined['Listed Price'] != 0]
-
-    # int days on market and absolute value
-    df_combined['Time On Market'] = df_combined['Time On Market'].astype(int)
-    df_combined['Time On Market'] = df_combined['Time On Market'].abs()
-
-    # sort date from newest to oldest
-    if status_type in ["ForSale" or "ForRent"]:
-        df_combined.sort_values(by='Time On Market',
-                                ascending=False, inplace=True)
+    # optional excel view of this run
+    if export_excel:
+        file_path = os.path.join(
+            store.desktop_path(), f"{zip_code}_{status_type}_{home_type}.xlsx")
 
-    # export to excel
-    df_combined.to_excel(writer, sheet_name='Combined Properties', index=False)
-    df_schools.to_excel(writer, sheet_name='Schools', index=False)
-    writer.close()
-    print(f"Data exported successfully to {file_path} ... Program End")
+        # XlsxWriter as the engine
+        writer = pd.ExcelWriter(file_path, engine='xlsxwriter')
+        df_combined.to_excel(
+            writer, sheet_name='Combined Properties', index=False)
+        df_schools.to_excel(writer, sheet_name='Schools', index=False)
+        writer.close()
+        print(f"Data exported successfully to {file_path}")
+    print("Program End")
 
 
 def main():
-    parser = argparse.ArgumentParser(
-        description="Fetch and export real estate data")
-    parser.add_argument("--zip_code", type=str,
-                        help="Zip code of the property location")
-    parser.add_argument("--home_type", type=str,
-                        help="Single Family / Townhomes / Apartments")
-    parser.add_argument("--status_type", type=str,
-                        help="Status type (ForSale or ForRent or Sold)")
-    parser.add_argument("--max_price", type=int,
-                        help="max price (maxPrice to search)")
-    parser.add_argument("--num_pages", type=int,
-                        help="Number of pages to fetch")
-
-    args = parser.parse_args()
-
-    fetch_and_export_data(zip_code=args.zip_code, home_type=args.home_type,
-                          status_type=args.status_type, max_price=args.max_price,
-                          num_pages=args.num_pages)
+    import realquantml
+    realquantml.main(['fetch'] + sys.argv[1:])
 
 
 if __name__ == "__main__":
@@ -0,0 +1,199 @@
+import argparse
+import importlib
+import sys
+
+# Only argparse/importlib are imported here. pandas, sklearn, matplotlib and
+# the API clients are pulled in by the subcommand that needs them, so
+# `realquantml distance` never pays for sklearn and `--help` is instant.
+
+# subcommand -> modules it imports when it runs (used by the startup benchmark);
+# '--fleet' variants are listed separately since only they import fleet
+COMMAND_MODULES = {
+    'fetch': ['main'],
+    'analyze': ['store', 'analysis'],
+    'train': ['store', 'ML'],
+    'train --fleet': ['store', 'ML', 'fleet'],
+    'predict': ['store', 'ML'],
+    'predict --fleet': ['store', 'ML', 'fleet'],
+    'distance': ['distance'],
+}
+
+
+def import_command_modules(command):
+    return [importlib.import_module(name) for name in COMMAND_MODULES[command]]
+
+
+# select a non-interactive backend unless a window was asked for
+def use_backend(show):
+    if not show:
+        import matplotlib
+        matplotlib.use('Agg')
+
+
+def read_source(args, status_type):
+    import store
+    return store.read_listings(file_name=args.file_name, status_type=status_type,
+                               zip_codes=args.zip_codes, home_type=args.home_type,
+                               start_date=args.start_date, end_date=args.end_date,
+                               db_path=args.db_path)
+
+
+def run_fetch(args):
+    import main
+    main.fetch_and_export_data(zip_code=args.zip_code, home_type=args.home_type,
+                               status_type=args.status_type, max_price=args.max_price,
+                               num_pages=args.num_pages, export_excel=args.excel,
+                               db_path=args.db_path)
+
+
+def run_analyze(args):
+    use_backend(args.show)
+    import analysis
+    data = read_source(args, "Sold")
+    if data.empty:
+        print("No sold listings match the given filters.")
+        return
+    analysis.analyze(data, output_path=args.output, show=args.show)
+
+
+def run_train(args):
+    use_backend(args.show)
+    import ML
+    data = read_source(args, "Sold")
+    if data.empty:
+        print("No sold listings match the given filters.")
+        return
+    if args.fleet:
+        import fleet
+        fleet.train_fleet(data, fleet_dir=args.fleet_dir, min_rows=args.min_rows,
+                          max_workers=args.workers)
+        return
+    models = ML.train_models(data, output_path=args.output, show=args.show)
+    ML.save_models(models, args.model_path)
+
+
+def run_predict(args):
+    import ML
+    data = read_source(args, args.status_type)
+    if data.empty:
+        print("No listings match the given filters.")
+        return
+    if args.fleet:
+        import fleet
+        predictions = fleet.predict_fleet(data, fleet_dir=args.fleet_dir)
+        if predictions is None:
+            return
+    else:
+        predictions = ML.predict(data, ML.load_models(args.model_path))
+    predictions.to_excel(args.output, index=False, engine='xlsxwriter')
+    print(f"{len(predictions)} predictions saved to {args.output}")
+
+
+def run_distance(args):
+    import distance
+    distance.print_nearby_schools(args.address, api_key=args.api_key, radius=args.radius)
+
+
+# workbook-or-store arguments shared by analyze/train/predict
+def add_source_arguments(parser):
+    parser.add_argument("file_name", nargs="?",
+                        help="Exported workbook (omit to read from the local store)")
+    parser.add_argument("--zip_codes", nargs="+",
+                        help="Zip codes to keep (for a workbook, read from the end of each address)")
+    parser.add_argument("--home_type", type=str,
+                        help="Single Family / Townhomes / Apartments")
+    parser.add_argument("--start_date", type=str,
+                        help="Earliest sold date (YYYY-MM-DD)")
+    parser.add_argument("--end_date", type=str,
+                        help="Latest sold date (YYYY-MM-DD)")
+    parser.add_argument("--db_path", type=str,
+                        help="Path of the local listing store")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="realquantml", description="RealQuantML real estate toolkit")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    fetch = subparsers.add_parser(
+        "fetch", help="Fetch Zillow/Realtor listings into the local store")
+    fetch.add_argument("--zip_code", type=str,
+                       help="Zip code of the property location")
+    fetch.add_argument("--home_type", type=str,
+                       help="Single Family / Townhomes / Apartments")
+    fetch.add_argument("--status_type", type=str,
+                       help="Status type (ForSale or ForRent or Sold)")
+    fetch.add_argument("--max_price", type=int,
+                       help="max price (maxPrice to search)")
+    fetch.add_argument("--num_pages", type=int,
+                       help="Number of pages to fetch")
+    fetch.add_argument("--excel", action="store_true",
+                       help="Also export this run to an Excel workbook on the Desktop")
+    fetch.add_argument("--db_path", type=str,
+                       help="Path of the local listing store (default: Desktop/realquantml.db)")
+    fetch.set_defaults(func=run_fetch)
+
+    analyze = subparsers.add_parser(
+        "analyze", help="Plot sold prices and annual averages excluding outliers")
+    add_source_arguments(analyze)
+    analyze.add_argument("--output", type=str, default="sold_price_analysis.png",
+                         help="Where to save the chart")
+    analyze.add_argument("--show", action="store_true",
+                         help="Also open the chart in a window")
+    analyze.set_defaults(func=run_analyze)
+
+    train = subparsers.add_parser(
+        "train", help="Train price models on sold listings")
+    add_source_arguments(train)
+    train.add_argument("--output", type=str, default="feature_importances.png",
+                       help="Where to save the feature importance chart")
+    train.add_argument("--model_path", type=str,
+                       help="Where to save the models (default: Desktop/realquantml_models.pkl)")
+    train.add_argument("--show", action="store_true",
+                       help="Also open the chart in a window")
+    train.add_argument("--fleet", action="store_true",
+                       help="Train one model per zip code x property type instead of one global model")
+    train.add_argument("--fleet_dir", type=str,
+                       help="Fleet registry directory (default: Desktop/realquantml_fleet)")
+    train.add_argument("--min_rows", type=int,
+                       help="Smallest segment given its own model; smaller ones use the "
+                            "global model (default: fleet.MIN_SEGMENT_ROWS)")
+    train.add_argument("--workers", type=int,
+                       help="Processes used to train the fleet (default: CPU count)")
+    train.set_defaults(func=run_train)
+
+    predict = subparsers.add_parser(
+        "predict", help="Predict prices for listings with trained models")
+    add_source_arguments(predict)
+    predict.add_argument("--status_type", type=str, default="ForSale",
+                         help="Status of the store listings to price (default: ForSale)")
+    predict.add_argument("--model_path", type=str,
+                         help="Models saved by train (default: Desktop/realquantml_models.pkl)")
+    predict.add_argument("--output", type=str, default="predictions.xlsx",
+                         help="Where to save the predictions")
+    predict.add_argument("--fleet", action="store_true",
+                         help="Route each listing to its segment model from the fleet")
+    predict.add_argument("--fleet_dir", type=str,
+                         help="Fleet registry directory (default: Desktop/realquantml_fleet)")
+    predict.set_defaults(func=run_predict)
+
+    distance = subparsers.add_parser(
+        "distance", help="Driving distance from an address to nearby schools")
+    distance.add_argument("address", nargs="?",
+                          help="Address to search from (prompted if omitted)")
+    distance.add_argument("--api_key", type=str,
+                          help="Google Maps API key (default: GOOGLE_MAPS_API_KEY)")
+    distance.add_argument("--radius", type=int, default=5000,
+                          help="Search radius in meters")
+    distance.set_defaults(func=run_distance)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
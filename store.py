@@ -0,0 +1,221 @@
+import os
+import platform
+import re
+import sqlite3
+from datetime import datetime
+
+import pandas as pd
+
+DB_FILE_NAME = "realquantml.db"
+
+# store column -> 'Combined Properties' sheet column
+COLUMN_NAMES = {
+    'sold_date': 'Sold Date',
+    'address': 'Address',
+    'price': 'Price',
+    'bedrooms': 'Bedrooms',
+    'bathrooms': 'Bathrooms',
+    'living_area': 'Living Area',
+    'home_type': 'Property Type',
+    'time_on_market': 'Time On Market',
+    'website': 'Website',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    address_key TEXT NOT NULL,
+    status_type TEXT NOT NULL,
+    zip_code TEXT,
+    home_type TEXT,
+    address TEXT,
+    sold_date TEXT,
+    price REAL,
+    bedrooms REAL,
+    bathrooms REAL,
+    living_area REAL,
+    time_on_market INTEGER,
+    website TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (address_key, status_type)
+);
+CREATE INDEX IF NOT EXISTS idx_listings_zip ON listings (zip_code);
+CREATE INDEX IF NOT EXISTS idx_listings_sold_date ON listings (sold_date);
+CREATE INDEX IF NOT EXISTS idx_listings_price ON listings (price);
+"""
+
+UPSERT = """
+INSERT INTO listings (address_key, status_type, zip_code, home_type, address,
+                      sold_date, price, bedrooms, bathrooms, living_area,
+                      time_on_market, website, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (address_key, status_type) DO UPDATE SET
+    zip_code = excluded.zip_code,
+    home_type = excluded.home_type,
+    address = excluded.address,
+    sold_date = excluded.sold_date,
+    price = excluded.price,
+    bedrooms = excluded.bedrooms,
+    bathrooms = excluded.bathrooms,
+    living_area = excluded.living_area,
+    time_on_market = excluded.time_on_market,
+    website = excluded.website,
+    updated_at = excluded.updated_at
+"""
+
+
+# function to locate the Desktop folder used for exports
+def desktop_path():
+    if platform.system() == 'Windows':
+        return os.path.join(os.environ['USERPROFILE'], 'Desktop')
+    return os.path.join(os.path.expanduser('~'), 'Desktop')
+
+
+def default_db_path():
+    return os.path.join(desktop_path(), DB_FILE_NAME)
+
+
+# function to open the store, creating tables and indexes on first use
+def connect(db_path=None):
+    db_path = db_path or default_db_path()
+    # headless machines often have no Desktop folder
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# Zillow and Realtor spell the same address differently ("St." / "St",
+# extra spaces, case), so key rows on a normalized form
+def canonical_address(address):
+    if address is None or pd.isna(address):
+        return None
+    address = str(address).lower()
+    address = re.sub(r"[.#]", "", address)
+    address = re.sub(r"\s*,\s*", ", ", address)
+    address = re.sub(r"\s+", " ", address)
+    return address.strip(" ,")
+
+
+def _to_iso_date(series):
+    dates = pd.to_datetime(series, format='%m/%d/%Y', errors='coerce')
+    return dates.dt.strftime('%Y-%m-%d')
+
+
+# function to upsert a 'Combined Properties' frame into the store
+def upsert_listings(df, zip_code, status_type, home_type, db_path=None):
+    price_column = 'Sold Price' if 'Sold Price' in df.columns else 'Listed Price'
+    rows = pd.DataFrame({
+        'address_key': df['Address'].map(canonical_address),
+        'address': df['Address'],
+        'sold_date': _to_iso_date(df['Sold Date']) if 'Sold Date' in df.columns else None,
+        'price': df[price_column],
+    }, index=df.index)
+    for column in ['Bedrooms', 'Bathrooms', 'Living Area', 'Time On Market', 'Website']:
+        rows[column] = df[column] if column in df.columns else None
+    rows = rows.dropna(subset=['address_key'])
+
+    # NaN/NaT -> None and numpy scalars -> Python values for sqlite3
+    rows = rows.astype(object).where(rows.notna(), None)
+    updated_at = datetime.now().isoformat(timespec='seconds')
+    params = [(key, status_type, zip_code, home_type, address, sold_date, price,
+               bedrooms, bathrooms, living_area, time_on_market, website, updated_at)
+              for key, address, sold_date, price, bedrooms, bathrooms, living_area,
+              time_on_market, website in rows.itertuples(index=False, name=None)]
+
+    conn = connect(db_path)
+    try:
+        with conn:
+            conn.executemany(UPSERT, params)
+    finally:
+        conn.close()
+
+    # duplicate addresses in one batch collapse onto a single row
+    return rows['address_key'].nunique()
+
+
+# function to pull a filtered slice; filters are pushed down into SQL so
+# only matching rows are read
+def load_listings(zip_codes=None, status_type=None, home_type=None,
+                  start_date=None, end_date=None, min_price=None,
+                  max_price=None, db_path=None):
+    clauses = []
+    params = []
+    if zip_codes:
+        zip_codes = [str(zip_code) for zip_code in zip_codes]
+        clauses.append(f"zip_code IN ({', '.join('?' * len(zip_codes))})")
+        params.extend(zip_codes)
+    if status_type is not None:
+        clauses.append("status_type = ?")
+        params.append(status_type)
+    if home_type is not None:
+        clauses.append("home_type = ?")
+        params.append(home_type)
+    if start_date is not None:
+        clauses.append("sold_date >= ?")
+        params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+    if end_date is not None:
+        clauses.append("sold_date <= ?")
+        params.append(pd.Timestamp(end_date).strftime('%Y-%m-%d'))
+    if min_price is not None:
+        clauses.append("price >= ?")
+        params.append(min_price)
+    if max_price is not None:
+        clauses.append("price <= ?")
+        params.append(max_price)
+
+    query = f"SELECT zip_code, {', '.join(COLUMN_NAMES)} FROM listings"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY sold_date DESC"
+
+    conn = connect(db_path)
+    try:
+        data = pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+    # hand back the same column names as the exported workbooks
+    price_name = {'Sold': 'Sold Price', 'ForSale': 'Listed Price',
+                  'ForRent': 'Listed Price'}.get(status_type, 'Price')
+    data = data.rename(columns=dict(COLUMN_NAMES, price=price_name,
+                                    zip_code='Zip Code'))
+    data['Sold Date'] = pd.to_datetime(data['Sold Date'], errors='coerce')
+    return data
+
+
+# workbooks have no zip column; take the zip code from the end of the address
+def address_zip_codes(addresses):
+    return addresses.str.extract(r"(\d{5})(?:-\d{4})?\s*$", expand=False)
+
+
+# function to apply the store filters to a workbook frame in pandas
+def filter_listings(data, zip_codes=None, home_type=None, start_date=None,
+                    end_date=None, min_price=None, max_price=None):
+    mask = pd.Series(True, index=data.index)
+    if zip_codes:
+        mask &= address_zip_codes(data['Address']).isin([str(zip_code) for zip_code in zip_codes])
+    if home_type is not None:
+        mask &= data['Property Type'] == home_type
+    # like NULL sold_date in SQL, listings without a sold date never match a date filter
+    sold_dates = data['Sold Date'] if 'Sold Date' in data.columns else pd.Series(pd.NaT, index=data.index)
+    if start_date is not None:
+        mask &= sold_dates >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= sold_dates <= pd.Timestamp(end_date)
+    price_column = 'Sold Price' if 'Sold Price' in data.columns else 'Listed Price'
+    if min_price is not None:
+        mask &= data[price_column] >= min_price
+    if max_price is not None:
+        mask &= data[price_column] <= max_price
+    return data[mask]
+
+
+# function to read either an exported workbook or a store slice, with the
+# same filters applied to both
+def read_listings(file_name=None, status_type="Sold", db_path=None, **filters):
+    if file_name:
+        data = pd.read_excel(file_name, sheet_name=0)
+        if 'Sold Date' in data.columns:
+            data['Sold Date'] = pd.to_datetime(data['Sold Date'], errors='coerce')
+        return filter_listings(data, **filters)
+    return load_listings(status_type=status_type, db_path=db_path, **filters)